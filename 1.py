@@ -15,23 +15,33 @@ Discord Bump Bot – полностью автоматический режим.
 # ----------------------------------------------------------------------
 from __future__ import annotations
 
+import atexit
+import functools
+import heapq
+import itertools
 import json
+import logging
+import logging.handlers
 import os
+import queue
 import re
 import sys
 import time
-import traceback
 import unicodedata
+from collections import deque
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
-from threading import Lock
-from typing import Any, Dict, List, Optional
+from threading import Event, Lock, Thread
+from typing import Any, Dict, List, Optional, Tuple
 
-import keyboard
-import pyautogui
 import pyperclip
 import pygetwindow as gw
 
+try:
+    import orjson                        # необязательно: ускоряет запись JSON
+except ImportError:
+    orjson = None
+
 import platform  # ← новое
 
 # ----------------------------------------------------------------------
@@ -40,14 +50,24 @@ import platform  # ← новое
 SCHEDULE_FILE = "schedule.json"
 RESPONSES_FILE = "responses.json"
 LOG_FILE = "bot.log"                     # '' → отключить запись в файл
+LOG_LEVEL = "INFO"                       # "DEBUG" – подробный журнал для отладки
+LOG_MAX_BYTES = 1_000_000                # размер bot.log, после которого он ротируется
+LOG_BACKUP_COUNT = 3                     # сколько старых логов хранить (bot.log.1 …)
 HOTKEY = "f12"                           # клавиша для вызова меню
-MESSAGE_SCAN_RETRIES = 5                 # попыток копировать весь чат (Ctrl+A)
+MESSAGE_SCAN_TIMEOUT = 5.0               # сколько секунд повторять копирование чата (Ctrl+A)
 TARGET_CHANNEL_NAME = "⁠🍀└・up-like"      # частичное совпадение названия канала
+CLEANUP_INTERVAL = 60                    # период очистки устаревших задач (сек)
+MAX_IDLE_WAIT = 1.0                      # максимум сна главного цикла (Ctrl+C в Windows)
+SAVE_DEBOUNCE = 2.0                      # задержка записи JSON‑файлов после изменений (сек)
 
 # ---- копирование -------------------------------------------------------
 COPY_METHOD = "context_menu"             # "context_menu" | "ctrl_a"
 COPY_HOTKEY = "c"                        # клавиша в контекст‑меню (обычно «c»)
 COPY_CONTEXT_OFFSET_RATIO = 0.12         # доля от высоты окна до точки клика
+KEY_SETTLE_DELAY = 0.05                  # пауза, чтобы Discord обработал вставку/Enter
+CLIPBOARD_TIMEOUT = 0.5                  # максимум ожидания изменения буфера обмена (сек)
+CLIPBOARD_POLL = 0.01                    # период опроса буфера обмена (сек)
+PRESERVE_CLIPBOARD = False               # восстанавливать буфер обмена после отправки
 
 # ---- двойной пробел ----------------------------------------------------
 DOUBLE_SPACE_ENABLED = True               # включить двойной пробел после .!? и в конце
@@ -58,43 +78,133 @@ DOUBLE_SPACE_ENABLED = True               # включить двойной пр
 state_lock = Lock()
 task_counter = 0
 
-scheduled_tasks: List[Dict[str, Any]] = []   # отложенные однократные команды
+# отложенные однократные команды – min‑куча (time, seq, задача); seq не даёт сравнивать dict
+scheduled_tasks: List[Tuple[float, int, Dict[str, Any]]] = []
+_task_seq = itertools.count()
 bump_tasks: List[Dict[str, Any]] = []      # задачи автопарсинга (только в текущей сессии)
+command_responses: Dict[str, Any] = {}     # пользовательские ответы (RESPONSES_FILE)
+
+_wake = Event()              # будит главный цикл раньше срока (новая задача, меню)
+_menu_requested = Event()    # выставляется обработчиком горячей клавиши
+_menu_open = Event()         # меню уже открыто в своём потоке
+_shutdown = Event()          # запрошен выход (пункт меню «Выход»)
+_schedule_dirty = Event()    # расписание изменено и ещё не записано на диск
+_responses_dirty = Event()   # то же для пользовательских ответов
+_save_requested = Event()    # будит фоновый поток записи
+_save_lock = Lock()          # не даёт фоновой записи и записи при выходе пересечься
+
+_HOTKEY_UPPER = HOTKEY.upper()           # для подсказок «Нажмите F12…»
+_BANNER = "=" * 60
+
+# ----------------------------------------------------------------------
+# PRECOMPILED PATTERNS
+# ----------------------------------------------------------------------
+_PUNCT_TBL = str.maketrans({c: " " for c in ";:.,()[]«»"})
+# Цифры и команды – только ASCII: таблицы классов меньше, сопоставление быстрее.
+# Unicode остаётся там, где нужна кириллица (единицы времени), и в разделителях `\s`:
+# Discord вставляет неразрывные и узкие пробелы, их размер заранее неизвестен.
+_RE_NUMWORD = re.compile(r"([0-9]+)\s*([a-zа-яё]+)")
+_RE_NUMS = re.compile(r"[0-9]+")
+# быстрые пути parse_duration_to_seconds для типичных форм «01:23:45» и «5m» / «30 с»
+_RE_HMS = re.compile(r"([0-9]+):([0-9]+):([0-9]+)")
+# класс единиц перечислен явно: Unicode IGNORECASE пропустил бы «ſ», «ᲃ» и т.п.
+_RE_SHORT_DURATION = re.compile(r"([0-9]+)\s*([hmsHMSчмсЧМС])")
+_RE_CMD_DIGIT = re.compile(r"(?:/up|/bump|/like)[^\n]*?[0-9]", re.IGNORECASE | re.ASCII)
+_RE_CMD_CLASSIFY = re.compile(r"(?P<cmd>/up|/bump|/like)", re.IGNORECASE | re.ASCII)
+_RE_DOUBLE_SPACE = re.compile(r"([.!?])\s+")
+_RE_BUMP_LINE = re.compile(
+    # (?u:[^\S\n]*) – любые Unicode‑пробелы, кроме перевода строки: поиск идёт по всему
+    # тексту сразу, и совпадение не должно перескакивать на следующую строку
+    r":\w+:(?u:[^\S\n]*)(/up|/bump|/like)\b.*\b[0-9]{2}:[0-9]{2}:[0-9]{2}\b",
+    re.IGNORECASE | re.ASCII,
+)
 
 # ----------------------------------------------------------------------
 # LOGGING HELPERS
 # ----------------------------------------------------------------------
-def _log(msg: str, level: str = "INFO") -> None:
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    line = f"[{ts}] [{level}] {msg}"
-    print(line)
+SUCCESS = 25                             # собственные уровни поверх стандартных
+STATUS = 21
+logging.addLevelName(SUCCESS, "SUCCESS")
+logging.addLevelName(STATUS, "STATUS")
+
+logger = logging.getLogger("bump")
+_LOG_BUFFER: Optional[logging.handlers.MemoryHandler] = None
+_LOG_QUEUE: queue.Queue = queue.Queue()
+_LOG_LISTENER: Optional[logging.handlers.QueueListener] = None
+
+
+def _setup_logging() -> None:
+    """
+    Консоль + буферизованный LOG_FILE; предупреждения и ошибки пишутся сразу.
+    Консоль пишется синхронно (порядок с подсказками `input()` не ломается),
+    а запись в файл делает фоновый поток `QueueListener` – меню и планировщик
+    не ждут диска.
+    """
+    global _LOG_BUFFER, _LOG_LISTENER
+    fmt = logging.Formatter("[%(asctime)s] [%(levelname)s] %(message)s", "%Y-%m-%d %H:%M:%S")
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(fmt)
+    logger.addHandler(console)
+
     if LOG_FILE:
-        try:
-            with open(LOG_FILE, "a", encoding="utf-8") as f:
-                f.write(line + "\n")
-        except Exception:
-            pass
+        # delay=True: файл открывается при первой записи и дальше не переоткрывается
+        file_handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+            encoding="utf-8", delay=True,
+        )
+        file_handler.setFormatter(fmt)
+        _LOG_BUFFER = logging.handlers.MemoryHandler(
+            capacity=64, flushLevel=logging.WARNING, target=file_handler
+        )
+        logger.addHandler(logging.handlers.QueueHandler(_LOG_QUEUE))
+        _LOG_LISTENER = logging.handlers.QueueListener(_LOG_QUEUE, _LOG_BUFFER)
+        _LOG_LISTENER.start()
+        # stop() дописывает остаток очереди; logging.shutdown (зарегистрирован
+        # раньше, значит выполнится позже) затем сбросит буфер в файл
+        atexit.register(_LOG_LISTENER.stop)
 
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
 
-def log_info(msg: str) -> None:            _log(msg, "INFO")
-def log_success(msg: str) -> None:        _log(f"✅ {msg}", "SUCCESS")
-def log_error(msg: str) -> None:           _log(f"❌ {msg}", "ERROR")
-def log_warn(msg: str) -> None:            _log(f"⚠️ {msg}", "WARNING")
-def log_debug(msg: str) -> None:           _log(f"🔍 {msg}", "DEBUG")
-def log_status(msg: str) -> None:          _log(msg, "STATUS")
+
+_setup_logging()
+
+
+# Аргументы подставляются лениво (%‑форматирование внутри logging): отфильтрованные
+# по уровню сообщения не форматируются вовсе.
+def log_info(msg: str, *args: Any) -> None:        logger.info(msg, *args)
+def log_success(msg: str, *args: Any) -> None:     logger.log(SUCCESS, "✅ " + msg, *args)
+def log_error(msg: str, *args: Any) -> None:       logger.error("❌ " + msg, *args)
+def log_warn(msg: str, *args: Any) -> None:        logger.warning("⚠️ " + msg, *args)
+def log_debug(msg: str, *args: Any) -> None:       logger.debug("🔍 " + msg, *args)
+def log_status(msg: str, *args: Any) -> None:      logger.log(STATUS, msg, *args)
+def log_exception(msg: str, *args: Any) -> None:   logger.exception("❌ " + msg, *args)
+
+
+_now_cache: Tuple[int, str] = (-1, "")     # (секунда, «HH:MM:SS»)
 
 
 def _now_str() -> str:
-    return datetime.now().strftime("%H:%M:%S")
+    """Текущее время «HH:MM:SS»; в пределах одной секунды строка не пересобирается."""
+    global _now_cache
+    sec = int(time.time())
+    cached_sec, text = _now_cache
+    if sec != cached_sec:
+        text = time.strftime("%H:%M:%S", time.localtime(sec))
+        _now_cache = (sec, text)         # одна атомарная замена – безопасно для потоков
+    return text
 
 
 # ----------------------------------------------------------------------
 # TIME UTILITIES
 # ----------------------------------------------------------------------
+@functools.lru_cache(maxsize=1024)
 def format_seconds(seconds: int) -> str:
-    """Приводит количество секунд к виду «Xч Yм Zs»."""
+    """Приводит количество секунд к виду «Xч Yм Zs» (чистая функция – кэшируется)."""
     if seconds < 0:
         return "не определено"
+    seconds = int(seconds)
     h, r = divmod(seconds, 3600)
     m, s = divmod(r, 60)
     parts = []
@@ -107,44 +217,65 @@ def format_seconds(seconds: int) -> str:
     return " ".join(parts)
 
 
+# Множитель единицы по коду первой буквы слова (0 – не единица времени)
+_UNIT_BY_ORD_SIZE = 1200                 # покрывает латиницу и кириллицу
+_UNIT_BY_ORD = [0] * _UNIT_BY_ORD_SIZE
+for _ch, _mult in (("ч", 3600), ("h", 3600), ("м", 60), ("m", 60), ("с", 1), ("s", 1)):
+    _UNIT_BY_ORD[ord(_ch)] = _mult
+del _ch, _mult
+
+
+@functools.lru_cache(maxsize=256)
 def parse_duration_to_seconds(text: str) -> Optional[int]:
     """
     Превращает строку вида «2 часа 5 минут 30 секунд», «2h 5m», «02:05:30» и т.п.
-    в количество секунд.
+    в количество секунд. Чистая функция – результаты кэшируются: bump‑боты
+    повторяют одни и те же формулировки.
     """
     try:
         # Убираем всё после первой запятой (чаще всего timestamp)
         if "," in text:
             text = text.split(",", 1)[0]
 
-        s = text.lower()
-        s = re.sub(r"[;:\.\,\(\)\[\]«»]", " ", s)
-        s = re.sub(r"\b(и|в|на|c|со|cо|с)\b", " ", s)
-        s = re.sub(r"\s+", " ", s).strip()
+        # Быстрые пути: строка целиком «HH:MM:SS» или «число + однобуквенная единица»
+        stripped = text.strip()
+        m = _RE_HMS.fullmatch(stripped)
+        if m:
+            total = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + int(m.group(3))
+            return total or None
+        m = _RE_SHORT_DURATION.fullmatch(stripped)
+        if m:
+            return int(m.group(1)) * _UNIT_BY_ORD[ord(m.group(2).lower())] or None
+
+        # Пунктуация → пробелы одним проходом. Предлоги не вырезаются: между
+        # токенами («2 часа и 5 минут») они не мешают, а «с» после числа – это
+        # секунды («1 мин 30 с» = 90). Предлог между числом и единицей
+        # («3 в ч») разрывает токен.
+        s = text.lower().translate(_PUNCT_TBL)
 
         total = 0
-        unit_map = {"ч": 3600, "h": 3600,
-                    "м": 60,   "m": 60,
-                    "с": 1,    "s": 1}
 
         # «число + слово», где слово начинается с ч/м/с (или h/m/s)
-        for m in re.finditer(r"(\d+)\s*([a-zа-яё]+)", s):
+        for m in _RE_NUMWORD.finditer(s):
             num = int(m.group(1))
-            first = m.group(2)[0]
-            if first in unit_map:
-                total += unit_map[first] * num
+            code = ord(m.group(2)[0])
+            mult = _UNIT_BY_ORD[code] if code < _UNIT_BY_ORD_SIZE else 0
+            if mult:
+                total += mult * num
             else:
-                log_debug(f"Неизвестная единица: «{m.group(2)}»")
+                log_debug("Неизвестная единица: «%s»", m.group(2))
 
         # Если ничего не найдено – пробуем «чистые» числа (HH:MM:SS, MM:SS, SS)
         if total == 0:
-            nums = list(map(int, re.findall(r"\d+", s)))
-            if len(nums) >= 3:
-                total = nums[0] * 3600 + nums[1] * 60 + nums[2]
-            elif len(nums) == 2:
-                total = nums[0] * 60 + nums[1]
-            elif len(nums) == 1:
-                total = nums[0]
+            # нужны только первые три числа – без промежуточных списков
+            nums = (int(m.group()) for m in _RE_NUMS.finditer(s))
+            n1, n2, n3 = next(nums, None), next(nums, None), next(nums, None)
+            if n3 is not None:
+                total = n1 * 3600 + n2 * 60 + n3
+            elif n2 is not None:
+                total = n1 * 60 + n2
+            elif n1 is not None:
+                total = n1
 
         return total if total > 0 else None
     except Exception as e:
@@ -155,28 +286,83 @@ def parse_duration_to_seconds(text: str) -> Optional[int]:
 # ----------------------------------------------------------------------
 # WINDOW / CHANNEL HELPERS
 # ----------------------------------------------------------------------
+_STRIP_CATEGORIES = frozenset(("Cf", "Zs", "Zl", "Zp", "Cc"))
+
+
+class _StripTable(dict):
+    """
+    Таблица для `str.translate`: пробельные и невидимые символы → None.
+    Заполняется лениво – категория символа вычисляется один раз при первой встрече,
+    дальше вся работа идёт внутри `translate` на C.
+    """
+
+    def __missing__(self, cp: int) -> Optional[int]:
+        ch = chr(cp)
+        value = None if ch.isspace() or unicodedata.category(ch) in _STRIP_CATEGORIES else cp
+        self[cp] = value
+        return value
+
+
+_STRIP_TBL = _StripTable()
+for _cp in range(256):                  # Latin‑1 заполняем сразу: это почти все заголовки
+    _STRIP_TBL[_cp]
+del _cp
+
+
+@functools.lru_cache(maxsize=256)
 def _normalize_str(s: str) -> str:
     """Нормализует строку (удаляет пробелы, невидимые символы, нижний регистр)."""
-    s = unicodedata.normalize("NFKC", s)
-    filtered = "".join(ch for ch in s
-                       if not (ch.isspace() or unicodedata.category(ch) in ("Cf", "Zs", "Zl", "Zp", "Cc")))
-    return filtered.lower()
+    if not s.isascii():
+        s = unicodedata.normalize("NFKC", s)      # NFKC не меняет ASCII – пропускаем
+    return s.translate(_STRIP_TBL).lower()
+
+
+_TARGET_NORM = _normalize_str(TARGET_CHANNEL_NAME) if TARGET_CHANNEL_NAME else ""
+_last_title_check: Tuple[Optional[str], bool] = (None, False)   # (заголовок, результат)
 
 
 def _channel_is_target_from_title(title: str) -> bool:
+    global _last_title_check
     if not TARGET_CHANNEL_NAME:
         return True
-    target = _normalize_str(TARGET_CHANNEL_NAME)
-    return target in _normalize_str(title)
+    # Дешёвая проверка без нормализации – срабатывает в большинстве случаев
+    if TARGET_CHANNEL_NAME in title:
+        return True
+
+    cached_title, cached_result = _last_title_check
+    if title == cached_title:
+        return cached_result
+
+    result = _TARGET_NORM in _normalize_str(title)
+    _last_title_check = (title, result)
+    return result
+
+
+_cached_win: Optional[Any] = None
 
 
 def find_discord_window() -> Optional[Any]:
-    """Ищет открытое окно Discord."""
+    """
+    Ищет открытое окно Discord.
+    Найденное окно кэшируется: все окна системы перебираются заново, только если
+    оно закрылось или его заголовок больше не содержит «Discord».
+    """
+    global _cached_win
+    if _cached_win is not None:
+        try:
+            if "Discord" in _cached_win.title:   # окно закрыто → исключение
+                return _cached_win
+        except Exception:
+            pass
+        _cached_win = None
+
     try:
         for w in gw.getWindowsWithTitle("Discord"):
             if "Discord" in w.title:
-                log_debug(f"Окно Discord найдено: {w.title}")
+                log_debug("Окно Discord найдено: %s", w.title)
+                _cached_win = w
                 return w
+        _cached_win = None
         return None
     except Exception as e:
         log_error(f"Ошибка поиска окна Discord: {e}")
@@ -200,7 +386,7 @@ def _apply_double_space(text: str) -> str:
     Добавляет второй пробел после знаков пунктуации .!? и в конец строки.
     """
     # двойной пробел после . ! ?
-    text = re.sub(r'([.!?])\s+', lambda m: f"{m.group(1)}  ", text)
+    text = _RE_DOUBLE_SPACE.sub(r"\1  ", text)
     # гарантируем двойной пробел в конце
     if not text.endswith("  "):
         text = f"{text}  "
@@ -218,6 +404,9 @@ def switch_to_english_layout() -> None:
     """
     if platform.system() != "Windows":
         return
+    keyboard = _get_keyboard()
+    if keyboard is None:
+        return
     # По умолчанию в Windows переключение – Alt+Shift.
     keyboard.send('alt+shift')
     time.sleep(0.2)
@@ -241,9 +430,95 @@ def _validate_command(cmd: str) -> bool:
     return True
 
 
+# ----------------------------------------------------------------------
+# GUI BACKEND (ленивый импорт pyautogui и keyboard)
+# ----------------------------------------------------------------------
+_pyautogui: Optional[Any] = None
+_keyboard: Optional[Any] = None
+_keyboard_checked = False
+
+
+def _get_pyautogui() -> Any:
+    """
+    Импортирует и настраивает pyautogui при первом обращении.
+    Модуль тянет PIL и платформенные бэкенды, поэтому не замедляет запуск
+    и работу меню, пока не понадобится отправка или копирование.
+    """
+    global _pyautogui
+    if _pyautogui is None:
+        import pyautogui
+        pyautogui.PAUSE = 0             # паузы ставим явно там, где они нужны
+        pyautogui.FAILSAFE = False      # отключаем «выход» движением мыши в угол
+        pyautogui.MINIMUM_DURATION = 0  # без порога «мгновенного» перемещения
+        # MINIMUM_SLEEP не трогаем: он ограничивает число шагов анимации moveTo(duration=…);
+        # при 0 перемещение идёт попиксельно и занимает секунды вместо заданного времени
+        pyautogui.DARWIN_CATCH_UP_TIME = 0
+        _pyautogui = pyautogui
+    return _pyautogui
+
+
+def _get_keyboard() -> Optional[Any]:
+    """
+    Импортирует keyboard при первом обращении; None – модуль недоступен
+    (не установлен или нет прав администратора / root для глобальных хуков).
+    Тогда меню открывается по Enter в консоли, а набор без буфера обмена невозможен.
+    """
+    global _keyboard, _keyboard_checked
+    if not _keyboard_checked:
+        _keyboard_checked = True
+        try:
+            import keyboard
+            _keyboard = keyboard
+        except (ImportError, OSError) as e:
+            log_warn(f"Модуль keyboard недоступен: {e}")
+    return _keyboard
+
+
 # ----------------------------------------------------------------------
 # COPY HELPERS (контекст‑меню и fallback Ctrl+A)
 # ----------------------------------------------------------------------
+def _snapshot_clipboard(max_len: int = 65536) -> Optional[str]:
+    """
+    Запоминает содержимое буфера обмена для последующего восстановления.
+    Слишком большой буфер (например, весь чат после Ctrl+A) не сохраняется –
+    возвращается None, и восстановление пропускается.
+    """
+    try:
+        raw = pyperclip.paste()
+    except Exception:
+        return None
+    return raw if len(raw) <= max_len else None
+
+
+def _restore_clipboard(snapshot: Optional[str]) -> None:
+    """Возвращает буфер обмена, сохранённый `_snapshot_clipboard`."""
+    if snapshot is None:
+        return
+    try:
+        pyperclip.copy(snapshot)
+    except Exception:
+        pass
+
+
+def _wait_clipboard(expected: Optional[str] = None) -> str:
+    """
+    Опрашивает буфер обмена до CLIPBOARD_TIMEOUT секунд вместо фиксированной паузы.
+    Ждёт, пока содержимое станет равным `expected`, а без него – непустым.
+    Возвращает последнее прочитанное значение (при таймауте – как есть).
+    """
+    deadline = time.monotonic() + CLIPBOARD_TIMEOUT
+    while True:
+        try:
+            clip = pyperclip.paste() or ""
+        except Exception:
+            clip = ""
+        if (clip == expected) if expected is not None else bool(clip):
+            return clip
+        if time.monotonic() >= deadline:
+            return clip
+        time.sleep(CLIPBOARD_POLL)
+
+
 def _looks_like_real_bump(text: str) -> bool:
     """
     Проверка, что в тексте действительно есть bump‑сообщение.
@@ -252,11 +527,11 @@ def _looks_like_real_bump(text: str) -> bool:
       • после эмодзи сразу /up, /bump или /like
       • в конце строки – timestamp HH:MM:SS
     """
-    pattern = re.compile(
-        r":\w+:\s*(/up|/bump|/like)\b.*\b\d{2}:\d{2}:\d{2}\b",
-        re.IGNORECASE
-    )
-    return any(pattern.search(line) for line in text.splitlines())
+    if not _has_command(text):
+        return False
+    # Шаблон не пересекает «\n», поэтому один поиск по всему тексту равносилен
+    # проверке каждой строки – без splitlines() и списка строк
+    return _RE_BUMP_LINE.search(text) is not None
 
 
 def _copy_via_context_menu() -> Optional[str]:
@@ -266,6 +541,7 @@ def _copy_via_context_menu() -> Optional[str]:
         log_error("Окно Discord не найдено")
         return None
 
+    pyautogui = _get_pyautogui()
     try:
         win.activate()
         time.sleep(0.3)
@@ -279,20 +555,20 @@ def _copy_via_context_menu() -> Optional[str]:
         # позиция чуть выше низа окна (настраивается коэффициентом)
         click_y = top + height - int(height * COPY_CONTEXT_OFFSET_RATIO)
         pyautogui.moveTo(left + width // 2, click_y, duration=0.2)
-        log_debug(f"Клик в контекст‑меню: ({left + width // 2}, {click_y})")
+        log_debug("Клик в контекст‑меню: (%d, %d)", left + width // 2, click_y)
         pyautogui.rightClick()
-        time.sleep(0.2)
+        time.sleep(0.2)                  # меню должно успеть отрисоваться
 
+        pyperclip.copy("")               # пустой буфер → видно, когда копирование дошло
         pyautogui.press(COPY_HOTKEY)
-        time.sleep(0.2)
-
-        copied = pyperclip.paste()
+        copied = _wait_clipboard()
         if not copied:
             log_warn("Контекст‑меню ничего не скопировало")
             return None
 
-        log_debug("Скопировано (контекст‑меню) – первые 200 символов:")
-        log_debug(copied[:200] + ("…" if len(copied) > 200 else ""))
+        # %.200s обрезает строку только если запись действительно выводится
+        log_debug("Скопировано (контекст‑меню) – первые 200 символов:\n%.200s%s",
+                  copied, "…" if len(copied) > 200 else "")
 
         if _looks_like_real_bump(copied):
             return copied
@@ -315,45 +591,46 @@ def _copy_via_ctrl_a() -> Optional[str]:
         except Exception:
             pass
 
-    original_clip = pyperclip.paste()
+    original_clip = _snapshot_clipboard()
+    pyautogui = _get_pyautogui()
 
-    try:
-        for attempt in range(1, MESSAGE_SCAN_RETRIES + 1):
-            log_info(f"Попытка {attempt}/{MESSAGE_SCAN_RETRIES}")
+    # Точка клика – центр окна Discord (или экрана); геометрия не меняется между попытками
+    if win:
+        left, top, width, height = map(int, (win.left, win.top, win.width, win.height))
+        click_x, click_y = left + width // 2, top + height // 2
+    else:
+        w, h = pyautogui.size()
+        click_x, click_y = w // 2, h // 2
 
-            if win:
-                left, top, width, height = map(int, (win.left, win.top, win.width, win.height))
-                pyautogui.moveTo(left + width // 2, top + height // 2, duration=0.1)
-            else:
-                w, h = pyautogui.size()
-                pyautogui.moveTo(w // 2, h // 2, duration=0.1)
+    # Ограничиваем общее время, а не число попыток; между попытками не спим –
+    # ожидание и так заложено в опросе буфера обмена
+    deadline = time.monotonic() + MESSAGE_SCAN_TIMEOUT
+    attempt = 0
+    try:
+        while time.monotonic() < deadline:
+            attempt += 1
+            log_info(f"Попытка {attempt}")
 
-            pyautogui.click()
+            pyautogui.click(click_x, click_y)
             time.sleep(0.2)
 
             pyautogui.hotkey("ctrl", "a")
-            time.sleep(0.15)
+            time.sleep(KEY_SETTLE_DELAY)
+            pyperclip.copy("")
             pyautogui.hotkey("ctrl", "c")
-            time.sleep(0.25)
-
-            copied = pyperclip.paste()
+            copied = _wait_clipboard()
             if copied and _looks_like_real_bump(copied):
                 log_success("Bump‑сообщение найдено через Ctrl+A")
                 return copied
 
             if copied:
-                log_debug("Скопировано (первые 300):")
-                log_debug(copied[:300] + ("…" if len(copied) > 300 else ""))
-
-            time.sleep(0.5)
+                log_debug("Скопировано (первые 300):\n%.300s%s",
+                          copied, "…" if len(copied) > 300 else "")
 
         log_error("Не удалось найти bump‑сообщение после всех попыток")
         return None
     finally:
-        try:
-            pyperclip.copy(original_clip)
-        except Exception:
-            pass
+        _restore_clipboard(original_clip)
 
 
 def get_last_bump_message() -> Optional[str]:
@@ -377,12 +654,16 @@ def get_last_bump_message() -> Optional[str]:
 # ----------------------------------------------------------------------
 # MESSAGE EXTRACTION & PARSING
 # ----------------------------------------------------------------------
-COMMAND_PATTERNS = [
-    r"/up", r"/bump", r"/like",
-    r"!\s*up", r"!\s*bump", r"!\s*like"
-]
+# /up, /bump, /like и !up, !bump, !like – общий префикс вместо шести альтернатив
+_COMMAND_REGEX = re.compile(r"(?:/|![ \t]*)(?:up|bump|like)\b", re.IGNORECASE | re.ASCII)
 
-_COMMAND_REGEX = re.compile("|".join(COMMAND_PATTERNS), re.IGNORECASE)
+
+def _has_command(text: str) -> bool:
+    """
+    Быстрая проверка подстрокой перед регуляркой: без /up, /bump или /like
+    текст заведомо не подходит. Команды бота всегда в нижнем регистре.
+    """
+    return "/up" in text or "/bump" in text or "/like" in text
 
 
 def extract_latest_bump_message(full_text: str) -> Optional[str]:
@@ -392,34 +673,48 @@ def extract_latest_bump_message(full_text: str) -> Optional[str]:
       • после команды есть хотя бы одна цифра.
     Возвращает до 5 последних подходящих строк, объединённых «\n».
     """
-    if not full_text:
+    if not full_text or not _has_command(full_text):
+        log_debug("В тексте нет команд /up, /bump, /like")
         return None
 
-    lines = [ln.rstrip() for ln in full_text.splitlines() if ln.strip()]
-
-    # команда + цифра после неё
-    cmd_digit = re.compile(r"(?:/up|/bump|/like).*?\d", re.IGNORECASE)
-    candidate = [ln for ln in lines if cmd_digit.search(ln)]
+    # Один проход регуляркой по всему тексту (после Ctrl+A – весь чат) без
+    # разбиения на строки; храним только 5 последних совпавших строк.
+    candidate: deque = deque(maxlen=5)
+    pos = 0
+    while True:
+        m = _RE_CMD_DIGIT.search(full_text, pos)   # «.» не пересекает \n
+        if not m:
+            break
+        start = full_text.rfind("\n", 0, m.start()) + 1
+        end = full_text.find("\n", m.end())
+        if end == -1:
+            end = len(full_text)
+        candidate.append(full_text[start:end].rstrip())
+        pos = end                                  # следующая строка
 
     if not candidate:
         log_debug("Не найдено строк с командами, за которыми идут цифры")
         return None
 
-    return "\n".join(candidate[-5:])
+    return "\n".join(candidate)
 
 
 def is_bump_message(text: str) -> bool:
     """Проверка: содержит /up|/bump|/like и цифру после команды."""
-    return bool(re.search(r"(?:/up|/bump|/like).*?\d", text, re.IGNORECASE))
+    if not _has_command(text):
+        return False
+    return bool(_RE_CMD_DIGIT.search(text))
 
 
-def _extract_time_from_line(line: str) -> Optional[int]:
+def _extract_time_from_line(line: str, match: Optional[re.Match] = None) -> Optional[int]:
     """
     Из строки с найденной командой вытаскивает количество секунд.
+    `match` – уже найденная в строке команда (чтобы не искать её повторно).
     """
-    match = re.search(r"(?i)(/up|/bump|/like|!\s*up|!\s*bump|!\s*like)", line)
-    if not match:
-        return None
+    if match is None:
+        match = _COMMAND_REGEX.search(line)
+        if not match:
+            return None
 
     after = line[match.end():].strip(" :‑–—,.;|#")
     if ',' in after:
@@ -445,45 +740,57 @@ def parse_time_from_message(message_text: str) -> Dict[str, Any]:
         return {"/up": None, "/bump": None, "/like": None, "success": False}
 
     result: Dict[str, Optional[int]] = {"/up": None, "/bump": None, "/like": None}
-    for cmd in ("/up", "/bump", "/like"):
-        for line in block.splitlines():
-            if re.search(rf"(?i){re.escape(cmd)}", line):
-                secs = _extract_time_from_line(line)
-                if secs is not None:
-                    result[cmd] = secs
-                    log_success(f"{cmd} → {format_seconds(secs)} (парсер)")
-                else:
-                    log_warn(f"Не удалось распарсить время из строки: «{line}»")
-                break
+    seen = set()                          # для каждой команды берём первую строку
+    for line in block.splitlines():
+        m = _RE_CMD_CLASSIFY.search(line)
+        if not m:
+            continue
+        cmd = m["cmd"].lower()
+        if cmd in seen:
+            continue
+        seen.add(cmd)
+
+        secs = _extract_time_from_line(line, m)
+        if secs is not None:
+            result[cmd] = secs
+            log_success(f"{cmd} → {format_seconds(secs)} (парсер)")
+        else:
+            log_warn(f"Не удалось распарсить время из строки: «{line}»")
 
     success = any(v is not None for v in result.values())
     result["success"] = success
-    log_debug(f"Результат парсинга: {result}")
+    log_debug("Результат парсинга: %s", result)
     return result  # type: ignore[return-value]
 
 
 # ----------------------------------------------------------------------
 # PERSISTENCE (schedule.json, responses.json)
 # ----------------------------------------------------------------------
+def _push_scheduled(task: Dict[str, Any]) -> None:
+    """Добавляет задачу в кучу `scheduled_tasks` (вызывать под `state_lock`)."""
+    heapq.heappush(scheduled_tasks, (task["time"], next(_task_seq), task))
+
+
 def load_schedule() -> None:
     global scheduled_tasks
     try:
         with open(SCHEDULE_FILE, "r", encoding="utf-8") as f:
             raw = json.load(f)
 
-        # Фильтрация записей с некорректными командами
+        # Фильтрация записей с некорректными командами или временем
         filtered: List[Dict[str, Any]] = []
         for t in raw:
             if isinstance(t, dict):
                 cmd = t.get("command", "")
-                if _validate_command(cmd):
+                if _validate_command(cmd) and isinstance(t.get("time"), (int, float)):
                     filtered.append(t)
                 else:
                     log_warn(f"Удалена некорректная задача из расписания: {t}")
             else:
                 log_warn(f"Неправильный формат записи в расписании (не dict): {t}")
 
-        scheduled_tasks = filtered
+        scheduled_tasks = [(t["time"], next(_task_seq), t) for t in filtered]
+        heapq.heapify(scheduled_tasks)
         if len(raw) != len(filtered):
             log_warn("В расписании обнаружены и удалены некорректные задачи")
             save_schedule()
@@ -497,13 +804,73 @@ def load_schedule() -> None:
         log_error(f"Ошибка загрузки расписания: {e}")
 
 
-def save_schedule() -> None:
+def _dump_json(data: Any, indent: bool = False) -> bytes:
+    """Сериализует `data` через orjson (если установлен) или стандартный json."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0))
+    if indent:
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+    else:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+_last_written: Dict[str, int] = {}      # путь → хэш последнего записанного содержимого
+
+
+def _write_json(path: str, data: Any, indent: bool = False) -> bool:
+    """
+    Атомарно пишет `data` в `path` (временный файл + fsync + `os.replace`).
+    Если содержимое совпадает с последней записью – файл не трогается, и возвращается False.
+    """
+    payload = _dump_json(data, indent)
+    digest = hash(payload)
+    if _last_written.get(path) == digest:
+        return False
+    tmp = path + ".tmp"
     try:
-        with open(SCHEDULE_FILE, "w", encoding="utf-8") as f:
-            json.dump(scheduled_tasks, f, ensure_ascii=False, indent=2)
-        log_debug("Расписание успешно сохранено")
-    except Exception as e:
-        log_error(f"Не удалось сохранить расписание: {e}")
+        with open(tmp, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())        # данные на диске до переименования – без «пустого» файла после сбоя
+        os.replace(tmp, path)
+    except BaseException:
+        # не оставляем недописанный .tmp (os.replace на Windows падает, если файл занят)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    _last_written[path] = digest
+    return True
+
+
+def save_schedule() -> None:
+    """
+    Помечает расписание изменённым. Запись выполняет поток `_persistence_writer`
+    не чаще раза в SAVE_DEBOUNCE секунд, поэтому вызов безопасен под `state_lock`.
+    """
+    _schedule_dirty.set()
+    _save_requested.set()
+
+
+def flush_schedule() -> None:
+    """
+    Немедленно записывает расписание (через временный файл и `os.replace`).
+    Если изменений с прошлой записи не было – ничего не делает.
+    """
+    with _save_lock:
+        if not _schedule_dirty.is_set():
+            return
+        _schedule_dirty.clear()
+        with state_lock:
+            tasks = [t for _, _, t in sorted(scheduled_tasks)]
+        try:
+            if _write_json(SCHEDULE_FILE, tasks):
+                log_debug("Расписание успешно сохранено")
+        except Exception as e:
+            _schedule_dirty.set()        # изменения не записаны – повторим при следующей записи
+            log_error(f"Не удалось сохранить расписание: {e}")
 
 
 def load_responses() -> None:
@@ -521,44 +888,75 @@ def load_responses() -> None:
 
 
 def save_responses() -> None:
-    try:
-        with open(RESPONSES_FILE, "w", encoding="utf-8") as f:
-            json.dump(command_responses, f, ensure_ascii=False, indent=2)
-        log_debug("Ответы сохранены")
-    except Exception as e:
-        log_error(f"Не удалось сохранить ответы: {e}")
+    """Помечает ответы изменёнными; запись – в `_persistence_writer`."""
+    _responses_dirty.set()
+    _save_requested.set()
+
+
+def flush_responses() -> None:
+    """Немедленно записывает ответы, если они менялись с прошлой записи."""
+    with _save_lock:
+        if not _responses_dirty.is_set():
+            return
+        _responses_dirty.clear()
+        try:
+            if _write_json(RESPONSES_FILE, command_responses, indent=True):
+                log_debug("Ответы сохранены")
+        except Exception as e:
+            _responses_dirty.set()       # изменения не записаны – повторим при следующей записи
+            log_error(f"Не удалось сохранить ответы: {e}")
+
+
+def _persistence_writer() -> None:
+    """Фоновый поток: собирает изменения за SAVE_DEBOUNCE секунд и пишет их разом."""
+    while True:
+        _save_requested.wait()
+        time.sleep(SAVE_DEBOUNCE)
+        _save_requested.clear()
+        flush_schedule()
+        flush_responses()
 
 
 # ----------------------------------------------------------------------
-# MESSAGE SENDING HELPERS (typewrite → clipboard fallback)
+# MESSAGE SENDING HELPERS (clipboard → keyboard.write fallback)
 # ----------------------------------------------------------------------
-def _send_via_typewrite(text: str) -> bool:
-    """Пытается набрать строку через pyautogui.typewrite."""
-    try:
-        pyautogui.typewrite(text, interval=0.02)
-        pyautogui.press("enter")
-        return True
-    except Exception as e:
-        log_debug(f"typewrite failed: {e}")
-        return False
+def _send_via_keyboard(text: str, double_enter: bool = False) -> None:
+    """
+    Набирает строку через `keyboard.write` – без пауз между символами.
+    Это последний способ отправки, поэтому ошибки не глушатся, а уходят вызывающему.
+    """
+    keyboard = _get_keyboard()
+    if keyboard is None:
+        raise RuntimeError("модуль keyboard недоступен")
+    keyboard.write(text)
+    keyboard.send("enter")
+    if double_enter:
+        time.sleep(KEY_SETTLE_DELAY)
+        keyboard.send("enter")
 
 
 def _send_via_clipboard(text: str, double_enter: bool = False) -> bool:
-    """Отправка сообщения через буфер обмена – гарантированный способ."""
-    original = pyperclip.paste()
+    """
+    Отправка сообщения через буфер обмена – быстрый способ, не зависит от раскладки.
+    Прежнее содержимое буфера возвращается только при PRESERVE_CLIPBOARD.
+    """
+    original = _snapshot_clipboard() if PRESERVE_CLIPBOARD else None
     try:
+        pyautogui = _get_pyautogui()
         pyperclip.copy(text)
-        time.sleep(0.1)
+        _wait_clipboard(text)
         pyautogui.hotkey("ctrl", "v")
+        time.sleep(KEY_SETTLE_DELAY)
         pyautogui.press("enter")
         if double_enter:
+            time.sleep(KEY_SETTLE_DELAY)
             pyautogui.press("enter")
         return True
+    except Exception as e:
+        log_debug("clipboard paste failed: %s", e)
+        return False
     finally:
-        try:
-            pyperclip.copy(original)
-        except Exception:
-            pass
+        _restore_clipboard(original)
 
 
 def send_message(text: str,
@@ -566,9 +964,10 @@ def send_message(text: str,
                  double_space: bool = False) -> bool:
     """
     Пытается «ввести» `text` в активное окно Discord.
-    1) Если сообщение начинается с «/» – используем clipboard‑fallback,
-       чтобы гарантировать правильный слеш независимо от раскладки.
-    2) Иначе – сначала пробуем typewrite, а при неудаче – тоже clipboard.
+    1) Сначала – вставка через буфер обмена: время не зависит от длины
+       сообщения, а слеш и Unicode вводятся корректно при любой раскладке.
+    2) При ошибке буфера обмена – набор через `keyboard.write`; если не удался
+       и он, исключение пробрасывается (задачу помечает сбойной исполнитель).
     `double_enter` → нажать Enter дважды.
     `double_space` → добавить двойной пробел после пунктуации и в конце.
     """
@@ -578,18 +977,14 @@ def send_message(text: str,
     if DOUBLE_SPACE_ENABLED or double_space:
         text = _apply_double_space(text)
 
-    # Если команда – отправляем через буфер обмена (гарантия корректного слеша)
-    if text.startswith("/"):
-        log_debug("Сообщение начинается с '/', используем clipboard‑fallback")
-        return _send_via_clipboard(text, double_enter)
-
-    # Пытаемся набрать обычным способом; если не получается – переходим к clipboard
-    if _send_via_typewrite(text):
-        log_success("Сообщение отправлено (typewrite)")
+    if _send_via_clipboard(text, double_enter):
+        log_success("Сообщение отправлено (clipboard)")
         return True
 
-    log_debug("typewrite не удался → используем clipboard")
-    return _send_via_clipboard(text, double_enter)
+    log_debug("clipboard не удался → используем keyboard.write")
+    _send_via_keyboard(text, double_enter)
+    log_success("Сообщение отправлено (keyboard)")
+    return True
 
 
 # ----------------------------------------------------------------------
@@ -598,7 +993,7 @@ def send_message(text: str,
 def _schedule_parsed_commands(task: Dict[str, Any]) -> None:
     """Получив времена из bump‑сообщения, планируем отдельные /up /bump /like."""
     now = time.time()
-    added = 0
+    subtasks: List[Dict[str, Any]] = []
 
     for cmd in task["commands_to_schedule"]:
         secs = task["parsed_times"].get(cmd)
@@ -617,19 +1012,21 @@ def _schedule_parsed_commands(task: Dict[str, Any]) -> None:
             "status": "pending",
             "created_at": datetime.now().strftime("%H:%M:%S")
         }
-
-        with state_lock:
-            scheduled_tasks.append(subtask)
-            task.setdefault("scheduled_subtasks", []).append(subtask)
+        subtasks.append(subtask)
 
         ts = datetime.fromtimestamp(exec_time).strftime("%H:%M:%S")
         left = format_seconds(int(exec_time - now))
         log_success(f"Запланировано {cmd} → {ts} (через {left})")
-        added += 1
 
-    if added:
+    if subtasks:
+        # одна блокировка на всю пачку подзадач
+        with state_lock:
+            for subtask in subtasks:
+                _push_scheduled(subtask)
+            task.setdefault("scheduled_subtasks", []).extend(subtasks)
+        _wake.set()
         save_schedule()
-        log_success(f"Всего запланировано {added} команд")
+        log_success(f"Всего запланировано {len(subtasks)} команд")
     else:
         log_error("Не удалось запланировать ни одной команды")
 
@@ -637,41 +1034,61 @@ def _schedule_parsed_commands(task: Dict[str, Any]) -> None:
 def execute_scheduled_tasks() -> None:
     """Выполняет задачи, время которых пришло."""
     now = time.time()
-    completed: List[Dict[str, Any]] = []
+    due: List[Dict[str, Any]] = []
 
     with state_lock:
-        for task in scheduled_tasks:
-            if task["status"] != "pending" or now < task["time"]:
-                continue
+        # Куча упорядочена по времени – снимаем только наступившие задачи
+        while scheduled_tasks and scheduled_tasks[0][0] <= now:
+            _, _, task = heapq.heappop(scheduled_tasks)
+            if task["status"] == "pending":
+                due.append(task)
+
+    if not due:
+        return
 
-            log_status(f"⚡ Выполнение: {task['command']}")
-            if send_message(
+    # Отправка (GUI‑ввод и паузы) идёт без блокировки – меню и другие потоки не ждут
+    for task in due:
+        log_status(f"⚡ Выполнение: {task['command']}")
+        try:
+            ok = send_message(
                 task["command"],
                 task.get("double_enter", False),
                 task.get("double_space", False)
-            ):
+            )
+        except Exception:
+            log_exception(f"Сбой отправки {task['command']}")
+            ok = False
+        with state_lock:
+            if ok:
                 task["status"] = "executed"
                 task["executed_at"] = now
-                log_success(f"Команда {task['command']} выполнена")
             else:
                 task["status"] = "error"
-                log_error(f"Ошибка выполнения {task['command']}")
-            completed.append(task)
+        if ok:
+            log_success(f"Команда {task['command']} выполнена")
+        else:
+            log_error(f"Ошибка выполнения {task['command']}")
 
-        for t in completed:
-            scheduled_tasks.remove(t)
+    save_schedule()
+
+
+def next_scheduled_ts() -> Optional[float]:
+    """Время ближайшей отложенной задачи (вершина кучи) или None."""
+    with state_lock:
+        return scheduled_tasks[0][0] if scheduled_tasks else None
 
 
 def cleanup_old_tasks(max_age_seconds: int = 300) -> None:
     """Удаляет задачи, время которых уже прошло более `max_age_seconds` назад."""
-    now = time.time()
+    cutoff = time.time() - max_age_seconds
     with state_lock:
         before = len(scheduled_tasks)
-        scheduled_tasks[:] = [
-            t for t in scheduled_tasks if t["time"] > now - max_age_seconds
-        ]
+        # устаревшие задачи всегда находятся на вершине кучи
+        while scheduled_tasks and scheduled_tasks[0][0] <= cutoff:
+            heapq.heappop(scheduled_tasks)
         after = len(scheduled_tasks)
     if before != after:
+        save_schedule()
         log_info(f"Удалено {before - after} устаревших задач")
 
 
@@ -730,60 +1147,73 @@ def add_bump_parse_task() -> None:
         "scheduled_subtasks": [],        # ссылки на подзадачи
         "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
-    bump_tasks.append(task)
+    with state_lock:
+        bump_tasks.append(task)
+    _wake.set()
     log_success(f"BUMP‑задача #{task_id} создана, старт через {delay}s")
 
 
 def execute_bump_tasks() -> None:
     """Цикл, обслуживающий все активные BUMP‑задачи."""
     now = time.time()
-    for task in bump_tasks[:]:
-        status = task["status"]
+    with state_lock:
+        # Завершённые на прошлом шаге задачи убираем одним проходом
+        bump_tasks[:] = [t for t in bump_tasks if t["status"] not in ("failed", "completed")]
+        active = list(bump_tasks)
 
-        if status == "waiting" and now >= task["start_time"]:
-            log_status(f"🚀 Запуск BUMP‑задачи #{task['id']}")
-            task["status"] = "sending"
+    for task in active:
+        try:
+            _advance_bump_task(task, now)
+        except Exception:
+            task["status"] = "failed"
+            log_exception(f"Сбой BUMP‑задачи #{task['id']}")
 
-        elif status == "sending":
-            if send_message(task["command"], task["double_enter"], task.get("double_space", False)):
-                task["status"] = "waiting_response"
-                task["response_deadline"] = now + 5
-                log_info("⏳ Ожидаем ответ от bump‑бота...")
-            else:
-                task["status"] = "failed"
-                log_error("Не удалось отправить стартовую команду")
-
-        elif status == "waiting_response" and now >= task.get("response_deadline", 0):
-            task["status"] = "reading"
-            log_info("🔍 Переходим к чтению сообщения...")
-
-        elif status == "reading":
-            msg = get_last_bump_message()
-            if msg:
-                task["message"] = msg
-                task["status"] = "parsing"
-                log_success("Сообщение получено и скопировано")
-            else:
-                task["status"] = "failed"
-                log_error("Не удалось скопировать bump‑сообщение")
-
-        elif status == "parsing":
-            parsed = parse_time_from_message(task.get("message", ""))
-            if parsed.get("success"):
-                task["parsed_times"] = parsed
-                task["status"] = "scheduling"
-                log_success("Парсинг прошёл успешно")
-            else:
-                task["status"] = "failed"
-                log_error("Парсинг не удался")
 
-        elif status == "scheduling":
-            _schedule_parsed_commands(task)
-            task["status"] = "completed"
-            log_success(f"BUMP‑задача #{task['id']} завершена")
+def _advance_bump_task(task: Dict[str, Any], now: float) -> None:
+    """Один шаг конечного автомата BUMP‑задачи."""
+    status = task["status"]
 
-        elif status in ("failed", "completed"):
-            bump_tasks.remove(task)
+    if status == "waiting" and now >= task["start_time"]:
+        log_status(f"🚀 Запуск BUMP‑задачи #{task['id']}")
+        task["status"] = "sending"
+
+    elif status == "sending":
+        if send_message(task["command"], task["double_enter"], task.get("double_space", False)):
+            task["status"] = "waiting_response"
+            task["response_deadline"] = now + 5
+            log_info("⏳ Ожидаем ответ от bump‑бота...")
+        else:
+            task["status"] = "failed"
+            log_error("Не удалось отправить стартовую команду")
+
+    elif status == "waiting_response" and now >= task.get("response_deadline", 0):
+        task["status"] = "reading"
+        log_info("🔍 Переходим к чтению сообщения...")
+
+    elif status == "reading":
+        msg = get_last_bump_message()
+        if msg:
+            task["message"] = msg
+            task["status"] = "parsing"
+            log_success("Сообщение получено и скопировано")
+        else:
+            task["status"] = "failed"
+            log_error("Не удалось скопировать bump‑сообщение")
+
+    elif status == "parsing":
+        parsed = parse_time_from_message(task.get("message", ""))
+        if parsed.get("success"):
+            task["parsed_times"] = parsed
+            task["status"] = "scheduling"
+            log_success("Парсинг прошёл успешно")
+        else:
+            task["status"] = "failed"
+            log_error("Парсинг не удался")
+
+    elif status == "scheduling":
+        _schedule_parsed_commands(task)
+        task["status"] = "completed"
+        log_success(f"BUMP‑задача #{task['id']} завершена")
 
 
 # ----------------------------------------------------------------------
@@ -803,7 +1233,7 @@ def add_one_time_task() -> None:
     double_enter = input(f"[{_now_str()}] Двойной Enter? (y/n): ").lower() == "y"
 
     with state_lock:
-        scheduled_tasks.append({
+        _push_scheduled({
             "id": f"manual_{int(time.time())}",
             "time": time.time() + delay,
             "command": cmd,
@@ -813,6 +1243,7 @@ def add_one_time_task() -> None:
             "created_at": datetime.now().strftime("%H:%M:%S")
         })
         save_schedule()
+    _wake.set()
 
     exec_ts = datetime.fromtimestamp(time.time() + delay).strftime("%H:%M:%S")
     log_success(f"Команда «{cmd}» запланирована на {exec_ts}")
@@ -830,82 +1261,128 @@ def show_schedule() -> None:
             return
 
         now = time.time()
-        for i, t in enumerate(scheduled_tasks, 1):
+        for i, (_, _, t) in enumerate(sorted(scheduled_tasks), 1):
             left = max(0, int(t["time"] - now))
             ts = datetime.fromtimestamp(t["time"]).strftime("%H:%M:%S")
             log_info(f"{i}. {ts} (через {format_seconds(left)}): {t['command']}")
 
 
+_BUMP_STATUS_LABELS = {
+    "waiting": "⏳ Ожидание старта",
+    "sending": "📤 Отправка команды",
+    "waiting_response": "⏳ Ожидание ответа",
+    "reading": "🔍 Чтение сообщения",
+    "parsing": "🔎 Парсинг",
+    "scheduling": "📅 Планирование подзадач",
+    "completed": "✅ Завершена",
+    "failed": "❌ Ошибка",
+}
+_TASK_SEPARATOR = "\n" + "─" * 30
+
+
 def show_bump_tasks() -> None:
     """Отображает список активных BUMP‑задач."""
     log_status("АКТИВНЫЕ BUMP‑ЗАДАЧИ")
-    if not bump_tasks:
+    with state_lock:
+        tasks = list(bump_tasks)
+    if not tasks:
         log_info("Нет активных задач")
         return
 
-    STATUS_MAP = {
-        "waiting": "⏳ Ожидание старта",
-        "sending": "📤 Отправка команды",
-        "waiting_response": "⏳ Ожидание ответа",
-        "reading": "🔍 Чтение сообщения",
-        "parsing": "🔎 Парсинг",
-        "scheduling": "📅 Планирование подзадач",
-        "completed": "✅ Завершена",
-        "failed": "❌ Ошибка",
-    }
-
-    for task in bump_tasks:
-        print("\n" + "─" * 30)
-        log_info(f"Задача #{task['id']}")
-        log_info(f"Статус: {STATUS_MAP.get(task['status'], task['status'])}")
-        log_info(f"Команда: {task['command']}")
-        log_info(f"Создана: {task['created_at']}")
-        if task.get("parsed_times"):
-            log_info("Распарсенные времена:")
+    # локальные имена вместо глобальных поисков в цикле
+    info, fmt, label = log_info, format_seconds, _BUMP_STATUS_LABELS.get
+    for task in tasks:
+        print(_TASK_SEPARATOR)
+        status = task["status"]
+        info(f"Задача #{task['id']}")
+        info(f"Статус: {label(status, status)}")
+        info(f"Команда: {task['command']}")
+        info(f"Создана: {task['created_at']}")
+        pt = task.get("parsed_times")
+        if pt:
+            info("Распарсенные времена:")
             for cmd in ("/up", "/bump", "/like"):
-                secs = task["parsed_times"].get(cmd)
+                secs = pt.get(cmd)
                 if secs:
-                    log_info(f"  {cmd}: {format_seconds(secs)}")
-        if task.get("scheduled_subtasks"):
-            log_info(f"Подзадач запланировано: {len(task['scheduled_subtasks'])}")
+                    info(f"  {cmd}: {fmt(secs)}")
+        subtasks = task.get("scheduled_subtasks")
+        if subtasks:
+            info(f"Подзадач запланировано: {len(subtasks)}")
 
 
-def test_parser() -> None:
-    """Тестовый разбор заранее подготовленного сообщения."""
-    log_status("ТЕСТ ПАРСИНГА")
-    test_msg = """Времени до
+_TEST_MSG = """Времени до
 :SDC: /up: 25 минут и 15 секунд, 17:24:25
 :ServerMonitoring: /bump: 2 часа 36 минут и 35 секунд, 19:35:44
 :DSMonitoring: /like: 3 часа 39 минут и 12 секунд, 20:38:22
 
 Сообщения будут высылаться в канал: ⁠🍀└・up-like"""
-    log_info("-" * 50)
-    log_info(test_msg)
-    log_info("-" * 50)
+_TEST_EXPECTED = {"/up": 1515, "/bump": 9395, "/like": 13152}
+# длительности, чей разбор зафиксирован явно (в т.ч. «с» как секунды, а не предлог)
+_TEST_DURATIONS = {
+    "1 мин 30 с": 90,
+    "30 с": 30,
+    "2 часа и 5 минут": 7500,
+    "2h 5m": 7500,
+    "02:05:30": 7530,
+    "7\u2009H": 25200,
+}
+
+
+def test_parser() -> None:
+    """Самопроверка парсера на эталонном сообщении `_TEST_MSG`."""
+    log_status("ТЕСТ ПАРСИНГА")
+    log_debug("Тестовое сообщение:\n%s", _TEST_MSG)
 
-    res = parse_time_from_message(test_msg)
-    if res.get("success"):
+    res = parse_time_from_message(_TEST_MSG)
+    mismatched = [
+        f"{cmd} = {res.get(cmd)} (ожидалось {secs})"
+        for cmd, secs in _TEST_EXPECTED.items() if res.get(cmd) != secs
+    ]
+    mismatched += [
+        f"«{text}» = {parse_duration_to_seconds(text)} (ожидалось {secs})"
+        for text, secs in _TEST_DURATIONS.items() if parse_duration_to_seconds(text) != secs
+    ]
+    if res.get("success") and not mismatched:
         log_success("Тест пройден")
-        for cmd in ("/up", "/bump", "/like"):
-            if res.get(cmd):
-                log_info(f"{cmd}: {format_seconds(res[cmd])}")
     else:
-        log_error("Тест НЕ пройден")
+        log_error("Тест НЕ пройден: " + ", ".join(mismatched))
+
+
+def _tail(path: str, n: int = 10, block: int = 4096) -> List[str]:
+    """
+    Последние `n` строк файла: читает блоками с конца, пока не наберёт `n` переводов
+    строки, – объём чтения не зависит от размера лога.
+    """
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b""
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    return data.decode("utf-8", errors="replace").splitlines()[-n:]
 
 
 def show_logs() -> None:
-    """Печатает последние 10 строк из лог‑файла."""
-    log_status("ПОСЛЕДНИЕ 10 ЗАПИСЕЙ ЛОГА")
+    """
+    Печатает последние 10 строк из лог‑файла. У строк уже есть свои метки времени,
+    поэтому они выводятся как есть одной записью в консоль и в журнал не попадают.
+    """
+    # файл открывается лениво – сперва сбрасываем очередь и буфер, потом проверяем
+    if _LOG_BUFFER is not None:
+        _LOG_QUEUE.join()                # дождаться, пока фоновый поток допишет очередь
+        _LOG_BUFFER.flush()
     if not LOG_FILE or not os.path.exists(LOG_FILE):
         log_warn("Лог‑файл не найден")
         return
     try:
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-        for line in lines[-10:]:
-            log_info(line.rstrip())
+        tail = _tail(LOG_FILE, 10)
     except Exception as e:
         log_error(f"Не удалось прочитать лог: {e}")
+        return
+    sys.stdout.write(f"[{_now_str()}] ПОСЛЕДНИЕ 10 ЗАПИСЕЙ ЛОГА\n" + "".join(f"{line}\n" for line in tail))
+    sys.stdout.flush()
 
 
 def cleanup_old_schedule() -> None:
@@ -915,21 +1392,23 @@ def cleanup_old_schedule() -> None:
     log_success("Устаревшие задачи удалены")
 
 
+# Пункты меню собраны в одну строку заранее – выводятся одной записью журнала
+_MENU_TEXT = "\n".join((
+    "1. 📅 Показать расписание",
+    "2. ➕ Добавить разовую команду",
+    "3. 🔄 Добавить BUMP‑задачу (автопарсинг)",
+    "4. 📊 Показать активные BUMP‑задачи",
+    "5. 🔍 Тестировать парсер",
+    "6. 📋 Показать последние записи лога",
+    "7. 🧹 Очистить устаревшее расписание",
+    "8. 🚪 Выход"
+))
+
+
 def show_menu() -> None:
     """Отображает главное меню и переадресует ввод."""
     log_status("ГЛАВОЕ МЕНЮ")
-    options = [
-        "1. 📅 Показать расписание",
-        "2. ➕ Добавить разовую команду",
-        "3. 🔄 Добавить BUMP‑задачу (автопарсинг)",
-        "4. 📊 Показать активные BUMP‑задачи",
-        "5. 🔍 Тестировать парсер",
-        "6. 📋 Показать последние записи лога",
-        "7. 🧹 Очистить устаревшее расписание",
-        "8. 🚪 Выход"
-    ]
-    for opt in options:
-        log_info(opt)
+    log_info(_MENU_TEXT)
 
     choice = input(f"[{_now_str()}] Выбор: ").strip()
     if choice == "1":
@@ -948,9 +1427,10 @@ def show_menu() -> None:
         cleanup_old_schedule()
     elif choice == "8":
         log_success("Выход...")
-        save_schedule()
-        save_responses()
-        sys.exit(0)
+        # меню работает в отдельном потоке – sys.exit() завершил бы только его;
+        # несохранённое запишет finally главного цикла
+        _shutdown.set()
+        _wake.set()
     else:
         log_warn("Неверный пункт меню")
 
@@ -958,35 +1438,140 @@ def show_menu() -> None:
 # ----------------------------------------------------------------------
 # MAIN LOOP
 # ----------------------------------------------------------------------
+_hotkey_armed = True       # False, пока HOTKEY зажата (игнорируем автоповтор)
+
+
+def _request_menu() -> None:
+    """Просит главный цикл открыть меню."""
+    _menu_requested.set()
+    _wake.set()
+
+
+def _on_hotkey_press(_event: Any) -> None:
+    """Нажатие HOTKEY (поток `keyboard`): срабатывает один раз до отпускания."""
+    global _hotkey_armed
+    if _hotkey_armed:
+        _hotkey_armed = False
+        _request_menu()
+
+
+def _on_hotkey_release(_event: Any) -> None:
+    """Отпускание HOTKEY снова разрешает открыть меню."""
+    global _hotkey_armed
+    _hotkey_armed = True
+
+
+def _menu_worker() -> None:
+    """Поток меню: `input()` блокирует только его, планировщик продолжает работу."""
+    try:
+        show_menu()
+    except Exception:
+        log_exception("Ошибка в меню")
+    finally:
+        _menu_open.clear()
+
+
+def _stdin_menu_trigger() -> None:
+    """
+    Замена горячей клавиши, если модуль keyboard недоступен: поток спит в чтении
+    консоли и по Enter открывает меню прямо в себе – `input()` меню не конкурирует
+    с чтением строки, а главный цикл продолжает обслуживать задачи.
+    """
+    while not _shutdown.is_set():
+        if not sys.stdin.readline():     # EOF – консоли нет, меню недоступно
+            return
+        if not _menu_open.is_set():
+            _menu_open.set()
+            log_status("Открываю меню")
+            _menu_worker()
+
+
+def _register_menu_trigger() -> None:
+    """Горячая клавиша через keyboard, а без прав/модуля – Enter в консоли."""
+    keyboard = _get_keyboard()
+    if keyboard is not None:
+        try:
+            keyboard.on_press_key(HOTKEY, _on_hotkey_press, suppress=False)
+            keyboard.on_release_key(HOTKEY, _on_hotkey_release, suppress=False)
+            log_info(f"Нажмите {_HOTKEY_UPPER} для вызова меню")
+            return
+        except Exception as e:
+            log_warn(f"Горячая клавиша недоступна: {e}")
+    log_info("Нажмите Enter в консоли для вызова меню")
+    Thread(target=_stdin_menu_trigger, name="stdin-menu", daemon=True).start()
+
+
+def _seconds_until_next_event(max_wait: float) -> float:
+    """
+    Сколько можно спать до ближайшей задачи или шага BUMP‑задачи,
+    но не дольше `max_wait` (время до очистки) и MAX_IDLE_WAIT.
+    """
+    now = time.time()
+    deadlines = [now + min(max_wait, MAX_IDLE_WAIT)]
+
+    next_ts = next_scheduled_ts()
+    if next_ts is not None:
+        deadlines.append(next_ts)
+
+    with state_lock:
+        tasks = list(bump_tasks)
+
+    for task in tasks:
+        status = task["status"]
+        if status == "waiting":
+            deadlines.append(task["start_time"])
+        elif status == "waiting_response":
+            deadlines.append(task.get("response_deadline", 0))
+        else:
+            deadlines.append(now)            # остальные шаги выполняются сразу
+
+    return max(0.0, min(deadlines) - now)
+
+
 def main_loop() -> None:
     log_status("БОТ ЗАПУЩЕН")
-    log_info(f"Нажмите {HOTKEY.upper()} для вызова меню")
-    last_cleanup = time.time()
+    # монотонные часы: перевод системного времени не сбивает период очистки
+    next_cleanup = time.monotonic() + CLEANUP_INTERVAL
+
+    _register_menu_trigger()
+    Thread(target=_persistence_writer, name="persistence-writer", daemon=True).start()
 
     try:
-        while True:
-            # Открываем меню по горячей клавише
-            if keyboard.is_pressed(HOTKEY):
-                log_status("Открываю меню")
-                show_menu()
-                # небольшая задержка, чтобы не «залипнуть» на клавише
-                time.sleep(0.5)
-
-            execute_scheduled_tasks()
-            execute_bump_tasks()
-
-            if time.time() - last_cleanup > 60:
+        while not _shutdown.is_set():
+            _wake.clear()
+
+            # Открываем меню по горячей клавише (не более одного одновременно)
+            if _menu_requested.is_set():
+                _menu_requested.clear()
+                if not _menu_open.is_set():
+                    _menu_open.set()
+                    log_status("Открываю меню")
+                    Thread(target=_menu_worker, name="menu", daemon=True).start()
+
+            # Сбой одного исполнителя не останавливает цикл и второго исполнителя
+            for step in (execute_scheduled_tasks, execute_bump_tasks):
+                try:
+                    step()
+                except Exception:
+                    log_exception(f"Сбой в {step.__name__}")
+
+            if time.monotonic() >= next_cleanup:
                 cleanup_old_tasks()
-                last_cleanup = time.time()
-
-            time.sleep(0.1)
+                # буфер журнала сам сбрасывается только на WARNING или при заполнении –
+                # раз в период дописываем накопившиеся INFO, чтобы не потерять их при сбое
+                if _LOG_BUFFER is not None:
+                    _LOG_BUFFER.flush()
+                next_cleanup = time.monotonic() + CLEANUP_INTERVAL
+
+            # Спим до ближайшего события; новая задача или HOTKEY будят раньше
+            _wake.wait(_seconds_until_next_event(next_cleanup - time.monotonic()))
     except KeyboardInterrupt:
         log_status("Остановка пользователем")
-    except Exception as e:
-        log_error(f"Критическая ошибка: {e}\n{traceback.format_exc()}")
+    except Exception:
+        log_exception("Критическая ошибка")
     finally:
-        save_schedule()
-        save_responses()
+        flush_schedule()
+        flush_responses()
         log_success("Работа завершена")
 
 
@@ -994,22 +1579,24 @@ def main_loop() -> None:
 # ENTRY POINT
 # ----------------------------------------------------------------------
 def main() -> None:
-    print("\n" + "=" * 60)
-    print("🤖 DISCORD BUMP BOT (автоматический режим) – полная переработка")
-    print("=" * 60)
-
-    pyautogui.PAUSE = 0.05          # ускоряем набор текста
-    pyautogui.FAILSAFE = False      # отключаем «выход» движением мыши в угол
+    # Статичная справка – одной записью в консоль (в лог‑файл она не нужна)
+    sys.stdout.write("\n".join((
+        "",
+        _BANNER,
+        "🤖 DISCORD BUMP BOT (автоматический режим) – полная переработка",
+        _BANNER,
+        "ИНСТРУКЦИЯ",
+        "  1. Откройте Discord и перейдите в канал с bump‑ботом.",
+        f"  2. Нажмите {_HOTKEY_UPPER} для вызова меню.",
+        "  3. Для автопарсинга выберите пункт «Добавить BUMP‑задачу».",
+        "  4. Для ручного планирования – «Добавить разовую команду».",
+        "  ВАЖНО: Окно Discord должно быть открыто и находиться на переднем плане!",
+        "",
+    )))
+    sys.stdout.flush()
 
     load_schedule()
     load_responses()
-
-    log_status("ИНСТРУКЦИЯ")
-    log_info("1. Откройте Discord и перейдите в канал с bump‑ботом.")
-    log_info(f"2. Нажмите {HOTKEY.upper()} для вызова меню.")
-    log_info("3. Для автопарсинга выберите пункт «Добавить BUMP‑задачу».")
-    log_info("4. Для ручного планирования – «Добавить разовую команду».")
-    log_info("ВАЖНО: Окно Discord должно быть открыто и находиться на переднем плане!")
     input(f"\n[{_now_str()}] Нажмите Enter, чтобы запустить…")
 
     main_loop()